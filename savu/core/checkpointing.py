@@ -116,7 +116,9 @@ class Checkpointing(object):
         for name, gp in entry.iteritems():
             data_entry = gp.require_group('meta_data')
             for key, value in data_entry.iteritems():
-                self.meta_data.set([dtype, name, key], value[key][...])
+                value = value.attrs[key] if key in value.attrs else \
+                    value[key][...]
+                self.meta_data.set([dtype, name, key], value)
 
     def _get_dataset_metadata(self, dtype, name):
         return self._data_meta_data(dtype)
@@ -395,15 +395,12 @@ class BaseTransport(object):
         if 'current_and_next' in self.exp.meta_data.get_dictionary():
             current_and_next = self.exp.meta_data.get('current_and_next')
 
-        count = 0
-        for key in out_data_dict.keys():
-            out_data = out_data_dict[key]
+        for key, out_data in out_data_dict.iteritems():
             filename = self.exp.meta_data.get(["filename", key])
             out_data.backing_file = self.hdf5._open_backing_h5(filename, 'a')
             c_and_n = 0 if not current_and_next else current_and_next[key]
             out_data.group_name, out_data.group = self.hdf5._create_entries(
                 out_data, key, c_and_n)
-            count += 1
 
     def _set_file_details(self, files):
         self.exp.meta_data.set('link_type', files['link_type'])
@@ -452,7 +449,7 @@ class BaseTransport(object):
             group_name = self.exp.meta_data.get(['group_name', name])
             link_type = self.exp.meta_data.get(['link_type', name])
 
-            if link_type is 'final_result':
+            if link_type == 'final_result':
                 group_name = 'final_result_' + data.get_name()
             else:
                 link = nxs_entry.require_group(link_type)
@@ -543,30 +540,34 @@ class BaseTransport(object):
 
     def __create_dataset(self, entry, name, data):
         if name not in entry.keys():
-            entry.create_dataset(name, data=data)
+            entry.create_dataset(name, data=data, track_times=False)
         else:
             entry[name][...] = data
 
     def __output_axis_labels(self, data, entry):
         axis_labels = data.data_info.get("axis_labels")
         ddict = data.meta_data.get_dictionary()
+        shape = data.get_shape()
+        require_dataset = entry.require_dataset
 
         axes = []
-        count = 0
-        for labels in axis_labels:
-            name = labels.keys()[0]
+        for count, labels in enumerate(axis_labels):
+            (name, units), = labels.items()
             axes.append(name)
             entry.attrs[name + '_indices'] = count
 
-            mData = ddict[name] if name in ddict.keys() \
-                else np.arange(data.get_shape()[count])
-            if isinstance(mData, list):
-                mData = np.array(mData)
+            mData = ddict[name] if name in ddict else np.arange(shape[count])
+            mData = np.asarray(mData, order='C')
 
-            axis_entry = entry.require_dataset(name, mData.shape, mData.dtype)
-            axis_entry[...] = mData[...]
-            axis_entry.attrs['units'] = labels.values()[0]
-            count += 1
+            axis_entry = require_dataset(name, mData.shape, mData.dtype)
+            # write_direct skips h5py's selection and type conversion layer,
+            # but is slower than the default path if a byte swap is needed and
+            # fails on empty arrays
+            if mData.size and mData.dtype.isnative:
+                axis_entry.write_direct(mData)
+            else:
+                axis_entry[...] = mData[...]
+            axis_entry.attrs['units'] = units
         entry.attrs['axes'] = axes
 
     def __output_data_patterns(self, data, entry):
@@ -588,4 +589,23 @@ class BaseTransport(object):
                 self._output_metadata_dict(nx_data, value)
             else:
                 nx_data.attrs[NX_CLASS] = 'NXdata'
+                if self.__is_small(value):
+                    # stored in the object header, rather than as a dataset
+                    try:
+                        nx_data.attrs[key] = value
+                        continue
+                    except Exception:
+                        # e.g. a type h5py cannot store as an attribute
+                        pass
                 self.__output_data(nx_data, value, key)
+
+    def __is_small(self, value, max_bytes=64):
+        """ Return True if value is a scalar, or a small numeric or string
+        array, that can be stored as an attribute. """
+        if np.isscalar(value):
+            # only string scalars can exceed the limit
+            return np.asarray(value).nbytes <= max_bytes
+        if not isinstance(value, (list, tuple, np.ndarray)):
+            return False
+        value = np.asarray(value)
+        return value.dtype.kind in 'biufcS' and 0 < value.nbytes <= max_bytes
@@ -143,7 +143,7 @@ class DosnaTransport(BaseTransport):
         dataset_name = "{}_{}".format(group_name,
                                       self._extract_digits(object_id))
 
-        if current_and_next is 0:
+        if current_and_next == 0:
             data.data = self.dosna_connection.create_dataset(dataset_name,
                                                              shape,
                                                              data.dtype)
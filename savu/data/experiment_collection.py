@@ -279,6 +279,17 @@ class Experiment(object):
             comm_dict['comm'].barrier()
         self._barrier_count += 1
 
+    def _ibarrier(self, communicator=MPI.COMM_WORLD, msg=''):
+        """ Start a non-blocking barrier, returning the request to Wait on, or
+        None if not running with MPI. """
+        request = None
+        if self.meta_data.get('mpi') is True:
+            logging.debug("Barrier %d: %d processes expected: %s",
+                          self._barrier_count, communicator.size, msg)
+            request = communicator.Ibarrier()
+        self._barrier_count += 1
+        return request
+
     def log(self, log_tag, log_level=logging.DEBUG):
         """
         Log the contents of the experiment at the specified level
@@ -23,15 +23,99 @@
 from savu.plugins.driver.cpu_plugin import CpuPlugin
 from savu.plugins.utils import register_plugin
 from savu.plugins.filters.base_filter import BaseFilter
-import peakutils as pe
 import numpy as np
-from scipy.signal import savgol_filter
+from scipy.ndimage import convolve1d
+from scipy.signal import savgol_coeffs
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _fill_plateaus(dy):
+    """ Give each flat run in dy (the sign of the first difference) the slope
+    either side of it, as peakutils.indexes does, so that a flat-topped peak
+    is found at its centre. dy must contain at least one non-zero value. """
+    zeros = np.flatnonzero(dy == 0)
+    end = dy.shape[0] - 1
+    j = 0
+    while j < zeros.shape[0]:
+        first = zeros[j]
+        while j + 1 < zeros.shape[0] and zeros[j + 1] == zeros[j] + 1:
+            j += 1
+        last = zeros[j]
+        j += 1
+        if first == 0:
+            left = dy[last + 1]
+            right = left
+        elif last == end:
+            left = dy[first - 1]
+            right = left
+        else:
+            left = dy[first - 1]
+            right = dy[last + 1]
+        split = (first + last + 1) // 2
+        dy[first:split] = left
+        dy[split:last + 1] = right
+
+
+def _find_peaks(y, thresh_abs, min_dist):
+    """ Return the indices of the local maxima in y that are above thresh_abs
+    and are not within min_dist of a higher peak. Compiled with numba, if it
+    is available. """
+    n = y.shape[0]
+    dy = np.empty(n - 1, dtype=np.int8)
+    nflat = 0
+    for i in range(n - 1):
+        if y[i + 1] > y[i]:
+            dy[i] = 1
+        elif y[i + 1] < y[i]:
+            dy[i] = -1
+        else:
+            dy[i] = 0
+            nflat += 1
+    if nflat == n - 1:
+        return np.empty(0, dtype=np.int32)
+    if nflat:
+        _fill_plateaus(dy)
+
+    peaks = np.empty(n, dtype=np.int32)
+    npeaks = 0
+    for i in range(1, n - 1):
+        if dy[i - 1] > 0 and dy[i] < 0 and y[i] > thresh_abs:
+            peaks[npeaks] = i
+            npeaks += 1
+    peaks = peaks[:npeaks]
+    if npeaks < 2 or min_dist <= 1:
+        return peaks
+
+    # suppress the neighbours of each remaining peak, highest first
+    keep = np.ones(npeaks, dtype=np.bool_)
+    order = np.argsort(y[peaks])[::-1]
+    for j in order:
+        if keep[j]:
+            k = j - 1
+            while k >= 0 and peaks[j] - peaks[k] <= min_dist:
+                keep[k] = False
+                k -= 1
+            k = j + 1
+            while k < npeaks and peaks[k] - peaks[j] <= min_dist:
+                keep[k] = False
+                k += 1
+    return peaks[keep]
+
+
+if njit is not None:
+    _fill_plateaus = njit(cache=True)(_fill_plateaus)
+    _find_peaks = njit(cache=True, fastmath=True)(_find_peaks)
 
 
 @register_plugin
 class FindPeaks(BaseFilter, CpuPlugin):
     """
-    This plugin uses peakutils to find peaks in spectra. This is then metadata.
+    This plugin finds peaks in spectra, following peakutils.indexes. This is \
+    then metadata.
     :param out_datasets: Create a list of the dataset(s). Default: ['Peaks'].
     :param thresh: Threshold for peak detection Default: 0.03.
     :param min_distance: Minimum distance for peak detection. Default: 15.
@@ -39,17 +123,18 @@ class FindPeaks(BaseFilter, CpuPlugin):
 
     def __init__(self):
         super(FindPeaks, self).__init__("FindPeaks")
+        self._smoothed = None
+        self._peaks = None
 
     def process_frames(self, data):
-        data = data[0]
+        shape = data[0].shape
+        # detector spectra carry far less precision than float32 provides
+        spectra = np.asarray(data[0], dtype=np.float32).reshape(-1, shape[-1])
+        self._set_buffers(spectra.shape)
         # filter to smooth noise
-        data = savgol_filter(data, 51, 3)
-        PeakIndex = pe.indexes(data, thres=self.parameters['thresh'],
-                               min_dist=self.parameters['min_distance'])
-
-        PeakIndexOut = np.zeros(data.shape)
-        PeakIndexOut[PeakIndex] = 1
-        return PeakIndexOut
+        spectra = self._smooth(spectra)
+        peaks = self._get_peaks(spectra)
+        return peaks.reshape(shape)
 
     def setup(self):
         # set up the output dataset that is created by the plugin
@@ -62,10 +147,87 @@ class FindPeaks(BaseFilter, CpuPlugin):
         nFrames = in_pData[0].get_total_frames()
         labels = ['frames.index', 'position.idx']
         shape = (nFrames, in_dataset[0].get_shape()[-1])
-        out_dataset[0].create_dataset(axis_labels=labels, shape=shape)
+        out_dataset[0].create_dataset(axis_labels=labels, shape=shape,
+                                      dtype=np.uint8)
         out_dataset[0].add_pattern("CHANNEL", slice_dims=(1,), core_dims=(0,))
         out_dataset[0].add_pattern("SPECTRUM", slice_dims=(0,), core_dims=(1,))
         out_pData[0].plugin_data_setup("SPECTRUM", self.get_max_frames())
+        self._set_smoothing_coeffs(51, 3)
+        if njit is not None:
+            # compile the peak search now, rather than in process_frames
+            _find_peaks(np.zeros(self._window, dtype=np.float32),
+                        np.float32(0), 1)
+
+    def _set_smoothing_coeffs(self, window, order):
+        """ Calculate the Savitzky-Golay coefficients once, rather than on
+        every call to process_frames. The edge coefficients reproduce the
+        polynomial fit used by savgol_filter in 'interp' mode. """
+        self._window = window
+        self._sg = savgol_coeffs(window, order).astype(np.float32)
+        half = window // 2
+        self._sg_left = np.array(
+            [savgol_coeffs(window, order, pos=i, use='dot')
+             for i in range(half)], dtype=np.float32)
+        self._sg_right = np.array(
+            [savgol_coeffs(window, order, pos=i, use='dot')
+             for i in range(half + 1, window)], dtype=np.float32)
+
+    def _set_buffers(self, shape):
+        """ Allocate the work buffers, which are reused by every call to
+        process_frames with the same number of frames. The returned peak
+        mask is copied by the framework, so can safely be overwritten. """
+        if self._smoothed is None or self._smoothed.shape != shape:
+            self._smoothed = np.empty(shape, dtype=np.float32)
+            self._peaks = np.empty(shape, dtype=np.uint8)
+
+    def _smooth(self, spectra):
+        """ Equivalent to savgol_filter(spectra, window, order, axis=-1). """
+        half = self._window // 2
+        smoothed = self._smoothed
+        convolve1d(spectra, self._sg, axis=-1, output=smoothed,
+                   mode='constant')
+        smoothed[:, :half] = spectra[:, :self._window].dot(self._sg_left.T)
+        smoothed[:, -half:] = spectra[:, -self._window:].dot(self._sg_right.T)
+        return smoothed
+
+    def _get_peaks(self, spectra):
+        """ Return a uint8 mask of the peaks in each spectrum (row), with the
+        threshold normalised to the range of that spectrum. """
+        lo = spectra.min(axis=1)
+        hi = spectra.max(axis=1)
+        thresh = lo + self.parameters['thresh']*(hi - lo)
+        min_dist = int(self.parameters['min_distance'])
+
+        if njit is None:
+            return self._get_peaks_vectorised(spectra, thresh, min_dist)
+
+        peaks = self._peaks
+        peaks[...] = 0
+        for y, t, row in zip(spectra, thresh, peaks):
+            row[_find_peaks(y, t, min_dist)] = 1
+        return peaks
+
+    def _get_peaks_vectorised(self, spectra, thresh, min_dist):
+        """ Numpy equivalent of _find_peaks, applied to all rows at once. """
+        dy = np.sign(np.diff(spectra, axis=1)).astype(np.int8)
+        nflat = (dy == 0).sum(axis=1)
+        for row in np.flatnonzero((nflat > 0) & (nflat < dy.shape[1])):
+            _fill_plateaus(dy[row])
+
+        peaks = self._peaks
+        peaks[:, [0, -1]] = 0
+        peaks[:, 1:-1] = (dy[:, :-1] > 0) & (dy[:, 1:] < 0) & \
+            (spectra[:, 1:-1] > thresh[:, None])
+        if min_dist <= 1:
+            return peaks
+
+        for y, row in zip(spectra, peaks):
+            idx = np.flatnonzero(row)
+            for p in idx[np.argsort(y[idx])[::-1]]:
+                if row[p]:
+                    row[max(0, p - min_dist):p + min_dist + 1] = 0
+                    row[p] = 1
+        return peaks
 
     def get_max_frames(self):
-        return 'single'
+        return 'multiple'
@@ -256,9 +256,11 @@ class SavuNexusLoader(BaseLoader):
 
     def _add_meta_data(self, dObj, group):
         def get_meta_data_entries(name, obj):
-            for key, val in obj.attrs.iteritems():
-                if val == 'NXdata':
-                    dObj.meta_data.set(name.split('/'), obj.values()[0][...])
+            if obj.attrs.get('NX_class') == 'NXdata':
+                key = name.split('/')[-1]
+                value = obj.attrs[key] if key in obj.attrs else \
+                    obj.values()[0][...]
+                dObj.meta_data.set(name.split('/'), value)
         group['meta_data'].visititems(get_meta_data_entries)
 
     def _update_plugin_numbers(self, datasets):
@@ -71,7 +71,6 @@ class Hdf5Saver(BaseSaver, CpuPlugin):
         chunking = Chunking(self.exp, pattern_idx)
         dtype = self.in_data.data.dtype
         chunks = chunking._calculate_chunking(shape, dtype)
-        self.exp._barrier()
         self.out_data = self.hdf5.create_dataset_nofill(
                 group, "data", shape, dtype, chunks=chunks)
 
@@ -22,6 +22,7 @@
 """
 
 import os
+import copy
 import h5py
 import logging
 from mpi4py import MPI
@@ -33,6 +34,10 @@ from savu.data.data_structures.data_types.base_type import BaseType
 
 
 NX_CLASS = 'NX_class'
+DEFAULT_CHUNK_CACHE = 16  # hdf5 raw data chunk cache size in MB
+
+# MPI.Info objects shared by all Hdf5Utils instances, keyed by their hints
+_mpi_info = {}
 
 
 class Hdf5Utils(object):
@@ -42,12 +47,50 @@ class Hdf5Utils(object):
 
     def __init__(self, exp):
         self.plugin = None
-        self.info = MPI.Info.Create()
         self.exp = exp
+        self.info = self.__get_mpi_info()
+        self.cache_kwargs = self.__get_chunk_cache_settings()
+
+    def __get_mpi_info(self):
+        """ Get the MPI.Info object holding the MPI I/O hints, which is only
+        created once for each set of hints. """
         # Get MPI I/O settings from the Savu config file
         settings = self.exp.meta_data.get(['system_params', 'mpi-io_settings'])
-        for key, value in settings.iteritems():
-            self.info.Set(key, value)
+        hints = dict((key, str(value)) for key, value in settings.iteritems())
+        # not set in tests that create an Experiment directly
+        if self.exp.meta_data.get_dictionary().get('mpi'):
+            self.__set_mpi_io_defaults(hints)
+
+        key = tuple(sorted(hints.items()))
+        if key not in _mpi_info:
+            info = MPI.Info.Create()
+            for hint, value in hints.iteritems():
+                info.Set(hint, value)
+            _mpi_info[key] = info
+        return _mpi_info[key]
+
+    def __set_mpi_io_defaults(self, hints):
+        """ Set MPI I/O hints that depend on the run, unless they are given in
+        the system parameters file. """
+        if 'cb_nodes' not in hints:
+            # one collective buffering aggregator per node
+            processes = self.exp.meta_data.get('processes')
+            hints['cb_nodes'] = str(processes.count(processes[0]))
+
+        mca_io = os.environ.get('OMPI_MCA_io', '')
+        if not _mpi_info and MPI.get_vendor()[0] == 'Open MPI' and \
+                'romio' not in mca_io and '^ompio' not in mca_io:
+            logging.debug("The ROMIO hints in mpi-io_settings may be ignored "
+                          "by the Open MPI ompio component: set "
+                          "OMPI_MCA_io=^ompio to use ROMIO.")
+
+    def __get_chunk_cache_settings(self):
+        """ Size the raw data chunk cache to hold at least one whole chunk, so
+        that partial chunk writes do not trigger a read-modify-write. """
+        pdict = self.exp.meta_data.get('system_params')
+        cache_size = pdict.get('chunk_cache_size', 0) or DEFAULT_CHUNK_CACHE
+        return {'rdcc_nbytes': int(cache_size*1e6), 'rdcc_nslots': 10007,
+                'rdcc_w0': 1.0}
 
     def _open_backing_h5(self, filename, mode, comm=MPI.COMM_WORLD, mpi=True):
         """
@@ -59,6 +102,7 @@ class Hdf5Utils(object):
 
         kwargs = {'driver': 'mpio', 'comm': comm, 'info': self.info}\
             if self.exp.meta_data.get('mpi') and mpi else {}
+        kwargs.update(self.cache_kwargs)
 
         backing_file = h5py.File(filename, mode, **kwargs)
 
@@ -129,9 +173,6 @@ class Hdf5Utils(object):
         return data
 
     def _create_entries(self, data, key, current_and_next):
-        msg = self.__class__.__name__ + '_create_entries'
-        self.exp._barrier(msg=msg+'1')
-
         expInfo = self.exp.meta_data
         group_name = expInfo.get(["group_name", key])
         data.data_info.set('group_name', group_name)
@@ -140,59 +181,83 @@ class Hdf5Utils(object):
         except AttributeError:
             pass
 
-        self.exp._barrier(msg=msg+'2')
         group = data.backing_file.require_group(group_name)
-        self.exp._barrier(msg=msg+'3')
         shape = data.get_shape()
 
+        if current_and_next == 0:
+            current_and_next = self.__get_default_patterns(data)
+
         if 'data' in group:
             data.data = group['data']
-        elif current_and_next is 0:
+        elif not current_and_next:
             logging.warn('Creating the dataset without chunks')
             data.data = group.create_dataset("data", shape, data.dtype)
         else:
-            chunk_max = self.__set_optimal_hdf5_chunk_cache_size(data, group)
             chunking = Chunking(self.exp, current_and_next)
+            chunk_max = self.__get_chunk_max(chunking)
             chunks = chunking._calculate_chunking(shape, data.dtype,
                                                   chunk_max=chunk_max)
 
-            self.exp._barrier(msg=msg+'4')
             data.data = self.create_dataset_nofill(
                     group, "data", shape, data.dtype, chunks=chunks)
 
-        self.exp._barrier(msg=msg+'5')
+        # group and dataset creation are collective, so a single barrier once
+        # all entries exist is sufficient
+        self.exp._barrier(msg=self.__class__.__name__ + '_create_entries')
         return group_name, group
 
-    def __set_optimal_hdf5_chunk_cache_size(self, data, group):
-        # calculate the number first
-        # change cache properties
-        propfaid = group.file.id.get_access_plist()
-        settings = list(propfaid.get_cache())
-        pdict = self.exp.meta_data.get('system_params')
-        max_chunk_size = pdict['max_chunk_size']
-        chunk_cache_size = pdict['chunk_cache_size']
-        settings[2] *= chunk_cache_size
-        propfaid.set_cache(*settings)
-        return max_chunk_size * 1e6  # convert MB to bytes
+    def __get_default_patterns(self, data):
+        """ Patterns to chunk by when the current and next patterns are
+        unknown: the pattern the plugin processes the data in if it has been
+        set, otherwise the first data pattern in name order, transferred one
+        frame at a time. """
+        patterns = data.get_data_patterns()
+        if not patterns:
+            return None
+        try:
+            name = data._get_plugin_data().get_pattern_name()
+        except Exception:
+            name = None
+        if name not in patterns:
+            name = sorted(patterns)[0]
+        pattern = copy.deepcopy(patterns[name])
+        pattern['max_frames_transfer'] = 1
+        return {'current': {name: pattern}, 'next': []}
+
+    def __get_chunk_max(self, chunking):
+        """ The maximum chunk size in bytes: the Chunking default of about
+        1MB, unless max_chunk_size or the chunk cache size is smaller. """
+        max_chunk_size = \
+            self.exp.meta_data.get('system_params')['max_chunk_size']*1e6
+        return min(chunking.default_chunk_max, max_chunk_size,
+                   self.cache_kwargs['rdcc_nbytes'])
 
     def _close_file(self, data):
         """
         Closes the backing file
         """
         if data.backing_file is not None:
+            filename = None
+            barrier = None
             try:
-                msg = self.__class__.__name__ + "_close_file" + \
-                data.backing_file.filename
-                self.exp._barrier(msg=msg)
-                logging.debug("Attempting to close the file ")
                 filename = data.backing_file.filename
+                data.backing_file.flush()
+                # wait for the other processes during the close, not before it
+                msg = self.__class__.__name__ + "_close_file" + filename
+                barrier = self.exp._ibarrier(msg=msg)
+                logging.debug("Attempting to close the file ")
                 data.backing_file.close()
                 logging.debug("File close successful: %s", filename)
                 data.backing_file = None
                 data.filename = filename # needed for tests
-                self.exp._barrier(msg=msg)
             except:
-                logging.debug("File close unsuccessful", filename)
+                logging.debug("File close unsuccessful: %s", filename)
+            finally:
+                # the other processes are waiting on this one, even if the
+                # close failed
+                if barrier is not None:
+                    logging.debug("Waiting on barrier: %s", msg)
+                    barrier.Wait()
 
     def _reopen_file(self, data, mode):
         filename = data.backing_file.filename
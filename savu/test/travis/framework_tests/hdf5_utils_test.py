@@ -0,0 +1,84 @@
+# Copyright 2014 Diamond Light Source Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+.. module:: hdf5_utils_test
+   :platform: Unix
+   :synopsis: Checking the chunking of datasets created by Hdf5Utils
+
+.. moduleauthor:: Nicola Wadeson <scientificsoftware@diamond.ac.uk>
+
+"""
+
+import os
+import h5py
+import unittest
+import numpy as np
+from savu.test import test_utils as tu
+
+from savu.data.data_structures.data import Data
+from savu.data.experiment_collection import Experiment
+from savu.plugins.savers.utils.hdf5_utils import Hdf5Utils
+
+
+class PluginDataStub(object):
+    def __init__(self, pattern_name):
+        self.pattern_name = pattern_name
+
+    def get_pattern_name(self):
+        return self.pattern_name
+
+
+class Hdf5UtilsTest(unittest.TestCase):
+
+    def setUp(self):
+        options = tu.set_experiment('tomoRaw')
+        options['processes'] = range(1)
+        options['mpi'] = False
+        # set a dummy process list
+        options['process_file'] = \
+            tu.get_test_process_path('loaders/basic_tomo_process.nxs')
+        self.exp = Experiment(options)
+        self.exp.meta_data.set(['group_name', 'tomo'], 'tomo')
+        self.filename = os.path.join(options['out_path'], 'hdf5_utils.h5')
+
+    def create_data(self, shape):
+        data = Data('tomo', self.exp)
+        data.set_axis_labels('rotation_angle.degrees', 'detector_y.pixel',
+                             'detector_x.pixel')
+        data.set_shape(shape)
+        data.set_dtype(np.float32)
+        data.add_pattern('PROJECTION', core_dims=(1, 2), slice_dims=(0,))
+        data.add_pattern('SINOGRAM', core_dims=(0, 2), slice_dims=(1,))
+        return data
+
+    def get_default_chunks(self, data):
+        """ Create the dataset with the current and next patterns unknown. """
+        with h5py.File(self.filename, 'w') as backing_file:
+            data.backing_file = backing_file
+            Hdf5Utils(self.exp)._create_entries(data, 'tomo', 0)
+            return data.data.chunks
+
+    def test_default_chunks_3D(self):
+        data = self.create_data((180, 200, 2560))
+        # the first pattern by name, split to about 1MB
+        self.assertEqual(self.get_default_chunks(data), (1, 200, 640))
+
+    def test_default_chunks_3D_plugin_pattern(self):
+        data = self.create_data((180, 200, 2560))
+        data._set_plugin_data(PluginDataStub('SINOGRAM'))
+        self.assertEqual(self.get_default_chunks(data), (180, 1, 1280))
+
+if __name__ == "__main__":
+    unittest.main()
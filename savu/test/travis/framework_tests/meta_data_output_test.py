@@ -0,0 +1,96 @@
+# Copyright 2014 Diamond Light Source Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+.. module:: meta_data_output_test
+   :platform: Unix
+   :synopsis: Checking metadata written to file is read back unchanged
+
+.. moduleauthor:: Nicola Wadeson <scientificsoftware@diamond.ac.uk>
+
+"""
+
+import os
+import h5py
+import shutil
+import tempfile
+import unittest
+import numpy as np
+
+from savu.data.meta_data import MetaData
+from savu.core.checkpointing import Checkpointing
+from savu.core.transports.base_transport import BaseTransport
+from savu.plugins.loaders.savu_nexus_loader import SavuNexusLoader
+
+
+class DataStub(object):
+    def __init__(self):
+        self.meta_data = MetaData()
+
+
+class MetaDataOutputTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmpdir, 'meta_data.h5')
+        self.mData = {'scalar': 3, 'float': 1.5, 'name': 'rotation',
+                      'long_name': 'a'*100, 'small': np.arange(4),
+                      'large': np.arange(100.)}
+        self.attrs = ['scalar', 'float', 'name', 'small']
+        self.datasets = ['long_name', 'large']
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _write(self, mData):
+        with h5py.File(self.filename, 'w') as f:
+            entry = f.require_group('out_data/tomo/meta_data')
+            BaseTransport()._output_metadata_dict(entry, mData)
+
+    def _check(self, mData, get):
+        for key, value in mData.iteritems():
+            np.testing.assert_array_equal(get(key), value)
+
+    def test_storage(self):
+        self._write(self.mData)
+        with h5py.File(self.filename, 'r') as f:
+            entry = f['out_data/tomo/meta_data']
+            for key in self.attrs:
+                self.assertTrue(key in entry[key].attrs)
+                self.assertFalse(key in entry[key])
+            for key in self.datasets:
+                self.assertFalse(key in entry[key].attrs)
+                self.assertTrue(key in entry[key])
+
+    def test_savu_nexus_loader(self):
+        mData = dict(self.mData, nested={'inner': np.arange(3)})
+        self._write(mData)
+        dObj = DataStub()
+        with h5py.File(self.filename, 'r') as f:
+            SavuNexusLoader()._add_meta_data(dObj, f['out_data/tomo'])
+        self._check(self.mData, dObj.meta_data.get)
+        np.testing.assert_array_equal(
+            dObj.meta_data.get(['nested', 'inner']), np.arange(3))
+
+    def test_checkpointing(self):
+        self._write(self.mData)
+        checkpoint = Checkpointing.__new__(Checkpointing)
+        checkpoint.meta_data = MetaData()
+        with h5py.File(self.filename, 'r') as f:
+            checkpoint._Checkpointing__set_dataset_metadata(f, 'out_data')
+        self._check(self.mData, lambda key: checkpoint.meta_data.get(
+            ['out_data', 'tomo', key]))
+
+if __name__ == "__main__":
+    unittest.main()
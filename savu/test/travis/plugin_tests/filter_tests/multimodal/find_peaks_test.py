@@ -21,6 +21,12 @@
 
 """
 import unittest
+import numpy as np
+import peakutils as pe
+from scipy.signal import savgol_filter
+
+import savu.plugins.filters.find_peaks as find_peaks
+from savu.plugins.filters.find_peaks import FindPeaks
 from savu.test import test_utils as tu
 from savu.test.travis.framework_tests.plugin_runner_test import \
     run_protected_plugin_runner
@@ -36,5 +42,97 @@ class FindPeaksTest(unittest.TestCase):
         run_protected_plugin_runner(options)
         tu.cleanup(options)
 
+
+class FindPeaksFunctionsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.plugin = FindPeaks()
+        self.plugin.parameters = {'thresh': 0.03, 'min_distance': 15}
+        self.plugin._set_smoothing_coeffs(51, 3)
+
+    def _get_spectra(self, nFrames=8, width=1024):
+        rng = np.random.RandomState(0)
+        x = np.arange(width)
+        spectra = rng.normal(0, 5, (nFrames, width))
+        for spectrum in spectra:
+            for i in range(20):
+                centre, sigma = rng.uniform(0, width), rng.uniform(3, 30)
+                spectrum += rng.uniform(10, 1000) * \
+                    np.exp(-(x - centre)**2/(2*sigma**2))
+        return spectra.astype(np.float32)
+
+    def _get_flat_top_spectra(self):
+        spectra = np.zeros((2, 400), dtype=np.float32)
+        spectra[:, 100:140] = 100
+        spectra[:, 180:210] = 80*np.hanning(30)
+        spectra[:, 250:300] = 50
+        # plateaus at both ends of the spectrum
+        spectra[1, :30] = 70
+        spectra[1, -20:] = 60
+        return spectra
+
+    def _get_expected(self, spectra):
+        expected = np.zeros(spectra.shape, dtype=np.uint8)
+        for y, row in zip(spectra, expected):
+            row[pe.indexes(y, thres=0.03, min_dist=15)] = 1
+        return expected
+
+    def _check_peaks(self, spectra):
+        expected = self._get_expected(spectra)
+        lo = spectra.min(axis=1)
+        hi = spectra.max(axis=1)
+        thresh = lo + 0.03*(hi - lo)
+
+        # the kernel with and without numba
+        kernel = find_peaks._find_peaks
+        for func in [kernel, getattr(kernel, 'py_func', kernel)]:
+            peaks = np.zeros(spectra.shape, dtype=np.uint8)
+            for y, t, row in zip(spectra, thresh, peaks):
+                row[func(y, t, 15)] = 1
+            np.testing.assert_array_equal(peaks, expected)
+
+        self.plugin._set_buffers(spectra.shape)
+        np.testing.assert_array_equal(
+            self.plugin._get_peaks_vectorised(spectra, thresh, 15), expected)
+
+        # _get_peaks falls back to the vectorised search without numba
+        njit = find_peaks.njit
+        try:
+            find_peaks.njit = None
+            np.testing.assert_array_equal(
+                self.plugin._get_peaks(spectra), expected)
+        finally:
+            find_peaks.njit = njit
+        np.testing.assert_array_equal(self.plugin._get_peaks(spectra),
+                                      expected)
+
+    def test_smooth(self):
+        spectra = self._get_spectra()
+        self.plugin._set_buffers(spectra.shape)
+        expected = savgol_filter(spectra.astype(np.float64), 51, 3)
+        np.testing.assert_allclose(self.plugin._smooth(spectra), expected,
+                                   rtol=0, atol=1e-5*np.abs(expected).max())
+
+    def test_get_peaks(self):
+        spectra = self._get_spectra()
+        self.plugin._set_buffers(spectra.shape)
+        self._check_peaks(self.plugin._smooth(spectra).copy())
+
+    def test_get_peaks_flat_top(self):
+        spectra = self._get_flat_top_spectra()
+        self._check_peaks(spectra)
+        self.assertEqual(list(np.flatnonzero(self._get_expected(spectra)[0])),
+                         [119, 194, 274])
+
+    def test_process_frames(self):
+        spectra = self._get_spectra()
+        expected = self._get_expected(savgol_filter(spectra, 51, 3))
+        np.testing.assert_array_equal(
+            self.plugin.process_frames([spectra]), expected)
+        # a single frame is passed in without the frames dimension
+        peaks = self.plugin.process_frames([spectra[3]])
+        self.assertEqual(peaks.shape, spectra[3].shape)
+        np.testing.assert_array_equal(peaks, expected[3])
+
 if __name__ == "__main__":
     unittest.main()